@@ -5,12 +5,14 @@ Handles publishing workflow: draft -> published -> archived
 
 import json
 import os
+from collections import defaultdict
 from datetime import datetime
+from itertools import count
 from pathlib import Path
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Tuple
 from dataclasses import dataclass, asdict
 
-@dataclass
+@dataclass(slots=True)
 class CardState:
     """Represents the publishing state of any card"""
     card_id: str  # Hash ID
@@ -38,6 +40,32 @@ class CardStateManager:
         self.state_file = self.data_dir / "card_states.json"
         self._ensure_data_dir()
         self.states = self._load_states()
+        
+        # Secondary indexes: state / card type -> card_ids. Dicts are used as
+        # insertion-ordered sets so lookups keep creation order.
+        self._by_state: Dict[str, Dict[str, None]] = defaultdict(dict)
+        self._by_type: Dict[str, Dict[str, None]] = defaultdict(dict)
+        # Creation position of each card; transitions append to the end of a state
+        # bucket, so buckets listed here are re-sorted by position on the next read
+        self._position: Dict[str, int] = {}
+        self._positions = count()
+        self._unsorted_states = set()
+        for card_state in self.states.values():
+            self._index(card_state)
+    
+    def _index(self, card_state: CardState):
+        """Add a card to the state and type indexes"""
+        self._position[card_state.card_id] = next(self._positions)
+        self._by_state[card_state.state][card_state.card_id] = None
+        self._by_type[card_state.card_type][card_state.card_id] = None
+    
+    def _unindex(self, card_state: CardState):
+        """Remove a card from the state and type indexes"""
+        self._by_state[card_state.state].pop(card_state.card_id, None)
+        self._by_type[card_state.card_type].pop(card_state.card_id, None)
+        self._position.pop(card_state.card_id, None)
+        if not self._by_type[card_state.card_type]:
+            del self._by_type[card_state.card_type]
     
     def _ensure_data_dir(self):
         """Create data directory if it doesn't exist"""
@@ -58,19 +86,43 @@ class CardStateManager:
             return {}
     
     def _save_states(self):
-        """Save all card states to JSON"""
+        """Save all card states to JSON (compact, replaced atomically)"""
         data = {
             card_id: asdict(state)
             for card_id, state in self.states.items()
         }
-        with open(self.state_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        # Write to a sibling temp file and swap it in so a crash never leaves a torn file
+        tmp_file = self.state_file.with_suffix(".tmp")
+        tmp_file.write_text(json.dumps(data, separators=(",", ":")))
+        os.replace(tmp_file, self.state_file)
     
     def create_card_state(self, card_id: str, card_type: str, notes: str = "") -> CardState:
         """Create a new card in draft state"""
         if card_id in self.states:
             return self.states[card_id]  # Already exists
         
+        state = self._add_card_state(card_id, card_type, notes)
+        self._save_states()
+        return state
+    
+    def create_cards_bulk(self, specs: List[Tuple[str, str, str]]) -> List[CardState]:
+        """
+        Create multiple cards in draft state at once
+        specs are (card_id, card_type, notes) tuples; existing cards are returned unchanged
+        """
+        count = len(self.states)
+        states = [self._add_card_state(*spec) for spec in specs]
+        
+        # Persist once for the whole batch instead of once per card
+        if len(self.states) != count:
+            self._save_states()
+        return states
+    
+    def _add_card_state(self, card_id: str, card_type: str, notes: str = "") -> CardState:
+        """Create a draft card in memory without persisting it"""
+        if card_id in self.states:
+            return self.states[card_id]  # Already exists
+        
         state = CardState(
             card_id=card_id,
             card_type=card_type,
@@ -80,18 +132,31 @@ class CardStateManager:
         )
         
         self.states[card_id] = state
-        self._save_states()
+        self._index(state)
         return state
     
     def get_card_state(self, card_id: str) -> Optional[CardState]:
         """Get the state of a specific card"""
         return self.states.get(card_id)
     
+    def get_card_states(self, card_ids: List[str]) -> Dict[str, CardState]:
+        """Get the states of many cards at once; unknown IDs are left out"""
+        states = self.states
+        return {card_id: states[card_id] for card_id in card_ids if card_id in states}
+    
     def transition_state(self, card_id: str, new_state: str) -> bool:
         """
         Transition a card to a new state
         Returns True if successful, False if invalid transition
         """
+        if not self._apply_transition(card_id, new_state):
+            return False
+        
+        self._save_states()
+        return True
+    
+    def _apply_transition(self, card_id: str, new_state: str) -> bool:
+        """Validate and apply a transition in memory without persisting it"""
         if card_id not in self.states:
             return False
         
@@ -106,7 +171,10 @@ class CardStateManager:
             return False
         
         # Update state
+        del self._by_state[current_state][card_id]
         card_state.state = new_state
+        self._by_state[new_state][card_id] = None
+        self._unsorted_states.add(new_state)
         
         # Update timestamps
         if new_state == "published":
@@ -114,22 +182,19 @@ class CardStateManager:
         elif new_state == "archived":
             card_state.archived_at = datetime.now().isoformat()
         
-        self._save_states()
         return True
     
     def get_cards_by_state(self, state: str) -> List[CardState]:
-        """Get all cards in a specific state"""
-        return [
-            card_state for card_state in self.states.values()
-            if card_state.state == state
-        ]
+        """Get all cards in a specific state, in creation order"""
+        if state in self._unsorted_states:
+            self._unsorted_states.discard(state)
+            position = self._position
+            self._by_state[state] = dict.fromkeys(sorted(self._by_state[state], key=position.__getitem__))
+        return [self.states[card_id] for card_id in self._by_state.get(state, ())]
     
     def get_cards_by_type(self, card_type: str) -> List[CardState]:
         """Get all cards of a specific type"""
-        return [
-            card_state for card_state in self.states.values()
-            if card_state.card_type == card_type
-        ]
+        return [self.states[card_id] for card_id in self._by_type.get(card_type, ())]
     
     def get_all_cards(self) -> List[CardState]:
         """Get all card states"""
@@ -138,32 +203,20 @@ class CardStateManager:
     def delete_card_state(self, card_id: str) -> bool:
         """Delete a card state (use carefully!)"""
         if card_id in self.states:
-            del self.states[card_id]
+            self._unindex(self.states.pop(card_id))
             self._save_states()
             return True
         return False
     
     def get_stats(self) -> Dict[str, int]:
         """Get statistics about card states"""
-        stats = {
+        return {
             "total": len(self.states),
-            "draft": 0,
-            "published": 0,
-            "archived": 0
+            "draft": len(self._by_state.get("draft", ())),
+            "published": len(self._by_state.get("published", ())),
+            "archived": len(self._by_state.get("archived", ())),
+            "by_type": {card_type: len(card_ids) for card_type, card_ids in self._by_type.items()}
         }
-        
-        # Count by type
-        type_counts = {}
-        
-        for card_state in self.states.values():
-            stats[card_state.state] += 1
-            
-            if card_state.card_type not in type_counts:
-                type_counts[card_state.card_type] = 0
-            type_counts[card_state.card_type] += 1
-        
-        stats["by_type"] = type_counts
-        return stats
     
     def bulk_transition(self, card_ids: List[str], new_state: str) -> Dict[str, bool]:
         """
@@ -172,7 +225,11 @@ class CardStateManager:
         """
         results = {}
         for card_id in card_ids:
-            results[card_id] = self.transition_state(card_id, new_state)
+            results[card_id] = self._apply_transition(card_id, new_state)
+        
+        # Persist once for the whole batch instead of once per card
+        if any(results.values()):
+            self._save_states()
         return results
     
     def can_transition(self, card_id: str, new_state: str) -> bool:
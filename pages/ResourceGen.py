@@ -4,12 +4,15 @@ WITH DATABASE PERSISTENCE AND STATE MANAGEMENT
 """
 
 import streamlit as st
+from streamlit.errors import StreamlitAPIException
+import numpy as np
 import pandas as pd
-from resource_core_generator import generate_resource_core, calculate_weight
+from resource_core_generator import generate_resource_core, generate_resource_core_batch, calculate_weight
 from card_database import (
-    init_database, save_card, load_recent_cards, clear_all_cards,
-    update_card_state, can_transition
+    init_database, save_card, save_cards_bulk, load_recent_cards, load_filtered_cards, clear_all_cards,
+    update_card_state, is_valid_transition, data_version
 )
+from utils import csv_bytes
 
 st.title("⚡ Resource Core Generator")
 
@@ -18,251 +21,282 @@ if 'db_initialized' not in st.session_state:
     init_database()
     st.session_state.db_initialized = True
 
-# Load cards from database
-if 'cards_loaded' not in st.session_state:
-    db_cards = load_recent_cards(limit=100)
-    st.session_state.generated_cards = db_cards
-    st.session_state.cards_loaded = True
+# Load cards from database; cached until a write bumps the data version
+@st.cache_data(ttl=60, show_spinner=False)
+def load_recent_cards_cached(card_type, limit, version):
+    return load_recent_cards(limit=limit, card_type=card_type)
+
+# Card history as one columnar frame, built once per data version; every section reads it
+STATE_EMOJI = {"draft": "📝", "published": "✅", "archived": "🗄️"}
+RARITIES = ["Common", "Uncommon", "Rare", "Epic", "Legendary"]
+SIZES = ["Small", "Medium", "Large", "Massive"]
+RESOURCE_TYPES = ["Energy", "Matter", "Signal", "Life", "Omni"]
+STAT_COLUMNS = ["T", "Q", "Cost", "RPT", "HP", "Links"]
+# Newest cards loaded into the page; the SQL LIMIT also caps what the table ships to the browser
+HISTORY_LIMIT = 100
+QUALITY_EDGES = [21, 41, 61, 81]
+QUALITY_LABELS = ["Q1-20", "Q21-40", "Q41-60", "Q61-80", "Q81-100"]
+
+def cards_frame(cards):
+    df = pd.DataFrame.from_records(
+        [(c.state, c.rarity, c.size, c.resource_type, c.card_id,
+          c.tier, c.quality, c.cost, c.rpt, c.hp, c.links, c.score) for c in cards],
+        columns=["State", "Rarity", "Size", "Type", "ID", "T", "Q", "Cost", "RPT", "HP", "Links", "Score"]
+    )
+    # Small fixed vocabularies as categoricals and small ints: less memory, faster value_counts/isin
+    df["Rarity"] = pd.Categorical(df["Rarity"], categories=RARITIES, ordered=True)
+    df["Size"] = pd.Categorical(df["Size"], categories=SIZES, ordered=True)
+    df["Type"] = pd.Categorical(df["Type"], categories=RESOURCE_TYPES)
+    df[STAT_COLUMNS] = df[STAT_COLUMNS].astype("int16")
+    # Score is the database's generated column; only rounding is left for display
+    df["Score"] = df["Score"].astype(float).round(1)
+    return df
+
+@st.cache_data(ttl=60, show_spinner=False)
+def history_frame(card_type, limit, version):
+    return cards_frame(load_recent_cards_cached(card_type, limit, version))
+
+# History filters run in SQL, so older matching cards are found too
+@st.cache_data(ttl=60, show_spinner=False)
+def filtered_history_frame(card_type, limit, version, states, rarities, sizes, resource_types):
+    return cards_frame(load_filtered_cards(states, rarities, sizes, resource_types, limit=limit, card_type=card_type))
+
+# Explicit column types so the table does not infer them from the data on every render
+HISTORY_COLUMN_CONFIG = {
+    "State": st.column_config.TextColumn(width="small"),
+    "Rarity": st.column_config.TextColumn(width="small"),
+    "ID": st.column_config.TextColumn(width="small"),
+    "T": st.column_config.NumberColumn(format="%d"),
+    "Q": st.column_config.NumberColumn(format="%d"),
+    "Score": st.column_config.ProgressColumn(format="%.1f", min_value=0, max_value=100)
+}
 
 # ============ GENERATOR SECTION ============
-st.header("🎲 Generator")
+def refresh_generator(message):
+    """After a write from the generator: reload the history frame and rerun only this fragment"""
+    st.session_state.cards_df = history_frame("Resource Core", HISTORY_LIMIT, data_version())
+    st.toast(message)
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        # Fragment scope is only allowed during a fragment rerun (not e.g. the first full run)
+        st.rerun(scope="app")
+
+# Fragments: widget changes inside a section rerun only that section. Generator writes
+# refresh only the generator (history and stats catch up on the next app rerun);
+# clears and batches call st.rerun(scope="app") so every section refreshes
+@st.fragment
+def render_generator():
+    st.header("🎲 Generator")
 
-gen_col1, gen_col2, gen_col3 = st.columns(3)
+    gen_col1, gen_col2, gen_col3 = st.columns(3)
 
-with gen_col1:
-    core_size = st.selectbox("Core Size", ["Random", "Small", "Medium", "Large", "Massive"])
+    with gen_col1:
+        core_size = st.selectbox("Core Size", ["Random"] + SIZES, key="core_size")
 
-with gen_col2:
-    resource_type = st.selectbox("Resource Type", ["Energy", "Matter", "Signal", "Life", "Omni"])
+    with gen_col2:
+        resource_type = st.selectbox("Resource Type", RESOURCE_TYPES, key="resource_type")
 
-with gen_col3:
-    st.write("")  # Spacer
-    st.write("")  # Spacer
-    if st.button("🎲 Generate", type="primary", use_container_width=True):
-        core = generate_resource_core(resource_type)
+    with gen_col3:
+        st.write("")  # Spacer
+        st.write("")  # Spacer
+        if st.button("🎲 Generate", type="primary", use_container_width=True):
+            core = generate_resource_core(resource_type, size=None if core_size == "Random" else core_size)
         
-        if core_size != "Random":
-            attempts = 0
-            while core.size != core_size and attempts < 100:
-                core = generate_resource_core(resource_type)
-                attempts += 1
+            # Save with draft state; no full rerun, the display below reads the refreshed frame
+            # and history/statistics pick the card up on the next app rerun
+            if save_card(core, card_type="Resource Core", state="draft", notes="Auto-generated"):
+                st.session_state.cards_df = history_frame("Resource Core", HISTORY_LIMIT, data_version())
+                st.toast("✅ Card saved as Draft!")
+
+    # Batch generation uses the same size/type; shown even when the history is empty or filtered out
+    batch_col1, batch_col2 = st.columns([2, 1])
+
+    with batch_col1:
+        batch_size = st.number_input("Batch size", min_value=10, max_value=10000, value=1000, step=10)
+
+    with batch_col2:
+        st.write("")  # Spacer
+        st.write("")  # Spacer
+        if st.button("🎲 Batch Generate", use_container_width=True):
+            batch = generate_resource_core_batch(int(batch_size), resource_type, size=None if core_size == "Random" else core_size)
         
-        # Save with draft state
-        if save_card(core, card_type="Resource Core", state="draft", notes="Auto-generated"):
-            st.session_state.generated_cards.insert(0, core)
-            st.success("✅ Card saved as Draft!")
-            st.rerun()
+            # One transaction / executemany for the whole batch
+            if save_cards_bulk(batch.itertuples(index=False), card_type="Resource Core", state="draft", notes="Batch-generated"):
+                st.success(f"✅ Saved {len(batch)} cards as Drafts!")
+                st.rerun(scope="app")
 
-# Most recent card display
-if st.session_state.generated_cards:
-    st.markdown("---")
-    st.subheader("🎴 Most Recent Card")
+    # Most recent card display
+    cards_df = st.session_state.cards_df
+    if not cards_df.empty:
+        st.markdown("---")
+        st.subheader("🎴 Most Recent Card")
     
-    core = st.session_state.generated_cards[0]
-    score = (core.quality * 0.7) + (core.tier * 3)
+        core = cards_df.iloc[0]
     
-    # State badge
-    state_emoji = {
-        "draft": "📝",
-        "published": "✅",
-        "archived": "🗄️"
-    }
-    state = getattr(core, 'state', 'draft')
-    st.markdown(f"### {state_emoji.get(state, '📝')} {state.upper()}")
+        # State badge
+        state = core["State"]
+        st.markdown(f"### {STATE_EMOJI.get(state, '📝')} {state.upper()}")
     
-    recent_col1, recent_col2, recent_col3, recent_col4 = st.columns(4)
+        recent_col1, recent_col2, recent_col3, recent_col4 = st.columns(4)
     
-    with recent_col1:
-        st.metric("Size", core.size)
-        st.metric("Type", core.resource_type)
+        with recent_col1:
+            st.metric("Size", core["Size"])
+            st.metric("Type", core["Type"])
     
-    with recent_col2:
-        st.metric("Tier", core.tier)
-        st.metric("Quality", core.quality)
+        with recent_col2:
+            st.metric("Tier", core["T"])
+            st.metric("Quality", core["Q"])
     
-    with recent_col3:
-        st.metric("Rarity", core.rarity)
-        st.metric("Score", f"{score:.1f}")
+        with recent_col3:
+            st.metric("Rarity", core["Rarity"])
+            st.metric("Score", f"{core['Score']:.1f}")
     
-    with recent_col4:
-        st.metric("Cost", core.cost)
-        st.metric("RPT", core.rpt)
+        with recent_col4:
+            st.metric("Cost", core["Cost"])
+            st.metric("RPT", core["RPT"])
     
-    st.code(f"ID: {core.card_id}", language=None)
+        st.code(f"ID: {core['ID']}", language=None)
     
-    # State transition buttons
-    st.markdown("---")
-    btn_col1, btn_col2, btn_col3 = st.columns(3)
+        # State transition buttons (checked against the loaded state; update_card_state re-checks in SQL)
+        st.markdown("---")
+        btn_col1, btn_col2, btn_col3 = st.columns(3)
     
-    with btn_col1:
-        if state == "draft" and can_transition(core.card_id, "published"):
-            if st.button("📤 Promote to Published", use_container_width=True, type="primary"):
-                if update_card_state(core.card_id, "published"):
-                    st.success("✅ Card published!")
-                    st.rerun()
+        with btn_col1:
+            if state == "draft" and is_valid_transition(state, "published"):
+                if st.button("📤 Promote to Published", use_container_width=True, type="primary"):
+                    if update_card_state(core["ID"], "published"):
+                        refresh_generator("✅ Card published!")
     
-    with btn_col2:
-        if state == "published" and can_transition(core.card_id, "archived"):
-            if st.button("🗄️ Archive Card", use_container_width=True):
-                if update_card_state(core.card_id, "archived"):
-                    st.success("✅ Card archived!")
-                    st.rerun()
+        with btn_col2:
+            if state == "published" and is_valid_transition(state, "archived"):
+                if st.button("🗄️ Archive Card", use_container_width=True):
+                    if update_card_state(core["ID"], "archived"):
+                        refresh_generator("✅ Card archived!")
     
-    with btn_col3:
-        if state == "draft" and can_transition(core.card_id, "archived"):
-            if st.button("🗑️ Skip to Archived", use_container_width=True):
-                if update_card_state(core.card_id, "archived"):
-                    st.success("✅ Card archived!")
-                    st.rerun()
+        with btn_col3:
+            if state == "draft" and is_valid_transition(state, "archived"):
+                if st.button("🗑️ Skip to Archived", use_container_width=True):
+                    if update_card_state(core["ID"], "archived"):
+                        refresh_generator("✅ Card archived!")
 
 # ============ SEARCH/FILTER SECTION ============
-st.markdown("---")
-st.header("🔍 Card History")
-
-filter_col1, filter_col2, filter_col3, filter_col4 = st.columns(4)
-
-with filter_col1:
-    search_state = st.multiselect("Filter by State", ["draft", "published", "archived"])
-
-with filter_col2:
-    search_rarity = st.multiselect("Filter by Rarity", ["Common", "Uncommon", "Rare", "Epic", "Legendary"])
-
-with filter_col3:
-    search_size = st.multiselect("Filter by Size", ["Small", "Medium", "Large", "Massive"])
-
-with filter_col4:
-    search_type = st.multiselect("Filter by Type", ["Energy", "Matter", "Signal", "Life", "Omni"])
+@st.fragment
+def render_history():
+    st.markdown("---")
+    st.header("🔍 Card History")
 
-# Apply filters
-filtered_cards = st.session_state.generated_cards
+    filter_col1, filter_col2, filter_col3, filter_col4 = st.columns(4)
 
-if search_state:
-    filtered_cards = [c for c in filtered_cards if getattr(c, 'state', 'draft') in search_state]
+    with filter_col1:
+        search_state = st.multiselect("Filter by State", ["draft", "published", "archived"])
 
-if search_rarity:
-    filtered_cards = [c for c in filtered_cards if c.rarity in search_rarity]
+    with filter_col2:
+        search_rarity = st.multiselect("Filter by Rarity", RARITIES)
 
-if search_size:
-    filtered_cards = [c for c in filtered_cards if c.size in search_size]
+    with filter_col3:
+        search_size = st.multiselect("Filter by Size", SIZES)
 
-if search_type:
-    filtered_cards = [c for c in filtered_cards if c.resource_type in search_type]
+    with filter_col4:
+        search_type = st.multiselect("Filter by Type", RESOURCE_TYPES)
 
-st.caption(f"Showing {len(filtered_cards)} of {len(st.session_state.generated_cards)} cards")
+    # Unfiltered view reuses the page's history frame; any filter becomes one SQL query
+    history_df = st.session_state.cards_df
+    if search_state or search_rarity or search_size or search_type:
+        filtered_df = filtered_history_frame(
+            "Resource Core", HISTORY_LIMIT, data_version(),
+            tuple(search_state), tuple(search_rarity), tuple(search_size), tuple(search_type)
+        )
+        st.caption(f"Showing {len(filtered_df)} matching cards (newest {HISTORY_LIMIT} at most)")
+    else:
+        filtered_df = history_df
+        st.caption(f"Showing {len(filtered_df)} most recent cards")
 
-# ============ DATA TABLE ============
-if filtered_cards:
-    data = []
-    for core in filtered_cards:
-        score = (core.quality * 0.7) + (core.tier * 3)
-        state = getattr(core, 'state', 'draft')
-        state_emoji = {"draft": "📝", "published": "✅", "archived": "🗄️"}
-        
-        data.append({
-            "State": f"{state_emoji.get(state, '📝')}",
-            "Rarity": core.rarity,
-            "Size": core.size,
-            "Type": core.resource_type,
-            "ID": core.card_id[:8],
-            "T": core.tier,
-            "Q": core.quality,
-            "Cost": core.cost,
-            "RPT": core.rpt,
-            "HP": core.hp,
-            "Links": core.links,
-            "Score": round(score, 1)
-        })
+    # ============ DATA TABLE ============
+    if not filtered_df.empty:
+        df = filtered_df.assign(
+            State=filtered_df["State"].map(STATE_EMOJI).fillna("📝"),
+            ID=filtered_df["ID"].str[:8]
+        )
     
-    df = pd.DataFrame(data)
+        st.dataframe(df, use_container_width=True, height=400, hide_index=True, column_config=HISTORY_COLUMN_CONFIG)
     
-    st.dataframe(df, use_container_width=True, height=400, hide_index=True)
+        # Action buttons
+        btn_col1, btn_col2 = st.columns(2)
     
-    # Action buttons
-    btn_col1, btn_col2, btn_col3 = st.columns(3)
+        with btn_col1:
+            st.download_button("📥 Download CSV", data=csv_bytes(df), file_name="starcore_resources.csv", mime="text/csv", use_container_width=True)
     
-    with btn_col1:
-        csv = df.to_csv(index=False).encode('utf-8')
-        st.download_button("📥 Download CSV", data=csv, file_name="starcore_resources.csv", mime="text/csv", use_container_width=True)
-    
-    with btn_col2:
-        if st.button("🗑️ Clear History", use_container_width=True):
-            if clear_all_cards(card_type="Resource Core"):
-                st.session_state.generated_cards = []
-                st.success("✅ Cleared!")
-                st.rerun()
-    
-    with btn_col3:
-        st.button("🎲 Batch Generate (Soon)", disabled=True, use_container_width=True)
+        with btn_col2:
+            if st.button("🗑️ Clear History", use_container_width=True):
+                if clear_all_cards(card_type="Resource Core"):
+                    st.success("✅ Cleared!")
+                    st.rerun(scope="app")
 
 # ============ STATISTICS SECTION ============
-if st.session_state.generated_cards:
-    st.markdown("---")
-    st.header("📈 Statistics")
-    
-    total = len(st.session_state.generated_cards)
-    avg_quality = sum(c.quality for c in st.session_state.generated_cards) / total
-    avg_tier = sum(c.tier for c in st.session_state.generated_cards) / total
-    epic_plus = len([c for c in st.session_state.generated_cards if c.rarity in ["Epic", "Legendary"]])
-    epic_rate = (epic_plus / total) * 100
-    
-    # Add state counts
-    draft_count = len([c for c in st.session_state.generated_cards if getattr(c, 'state', 'draft') == 'draft'])
-    published_count = len([c for c in st.session_state.generated_cards if getattr(c, 'state', 'draft') == 'published'])
-    archived_count = len([c for c in st.session_state.generated_cards if getattr(c, 'state', 'draft') == 'archived'])
-    
-    stat_col1, stat_col2, stat_col3, stat_col4, stat_col5 = st.columns(5)
-    
-    with stat_col1:
-        st.metric("Total Cards", total)
-    with stat_col2:
-        st.metric("📝 Drafts", draft_count)
-    with stat_col3:
-        st.metric("✅ Published", published_count)
-    with stat_col4:
-        st.metric("🗄️ Archived", archived_count)
-    with stat_col5:
-        st.metric("Epic+ Rate", f"{epic_rate:.1f}%")
+# Aggregates and chart frames keyed on the data version; unchanged data is a cache hit
+@st.cache_data(ttl=60, show_spinner=False)
+def compute_stats(card_type, limit, version):
+    history_df = history_frame(card_type, limit, version)
+    total = len(history_df)
+    state_counts = history_df["State"].value_counts()
+    # Bracket index per card from the bin edges, then one histogram pass
+    quality_counts = np.bincount(np.digitize(history_df["Q"].to_numpy(), QUALITY_EDGES), minlength=len(QUALITY_LABELS))
+    return {
+        "total": total,
+        "avg_quality": history_df["Q"].mean() if total else 0,
+        "avg_tier": history_df["T"].mean() if total else 0,
+        "epic_rate": history_df["Rarity"].isin(["Epic", "Legendary"]).mean() * 100 if total else 0,
+        "draft": state_counts.get("draft", 0),
+        "published": state_counts.get("published", 0),
+        "archived": state_counts.get("archived", 0),
+        "rarity_df": history_df["Rarity"].value_counts().to_frame("Count"),
+        "size_df": history_df["Size"].value_counts().to_frame("Count"),
+        "type_df": history_df["Type"].value_counts().to_frame("Count"),
+        "quality_df": pd.DataFrame({"Count": quality_counts}, index=QUALITY_LABELS)
+    }
+
+def render_stats(stats):
+    if stats["total"]:
+        st.markdown("---")
+        st.header("📈 Statistics")
     
-    # Distribution charts
-    chart_col1, chart_col2, chart_col3 = st.columns(3)
+        stat_col1, stat_col2, stat_col3, stat_col4, stat_col5 = st.columns(5)
     
-    with chart_col1:
-        st.subheader("Rarity")
-        rarity_counts = {}
-        for c in st.session_state.generated_cards:
-            rarity_counts[c.rarity] = rarity_counts.get(c.rarity, 0) + 1
-        st.bar_chart(pd.DataFrame({"Count": list(rarity_counts.values())}, index=list(rarity_counts.keys())))
+        with stat_col1:
+            st.metric("Total Cards", stats["total"])
+        with stat_col2:
+            st.metric("📝 Drafts", stats["draft"])
+        with stat_col3:
+            st.metric("✅ Published", stats["published"])
+        with stat_col4:
+            st.metric("🗄️ Archived", stats["archived"])
+        with stat_col5:
+            st.metric("Epic+ Rate", f"{stats['epic_rate']:.1f}%")
     
-    with chart_col2:
-        st.subheader("Size")
-        size_counts = {}
-        for c in st.session_state.generated_cards:
-            size_counts[c.size] = size_counts.get(c.size, 0) + 1
-        st.bar_chart(pd.DataFrame({"Count": list(size_counts.values())}, index=list(size_counts.keys())))
+        # Distribution charts
+        chart_col1, chart_col2, chart_col3 = st.columns(3)
     
-    with chart_col3:
-        st.subheader("Type")
-        type_counts = {}
-        for c in st.session_state.generated_cards:
-            type_counts[c.resource_type] = type_counts.get(c.resource_type, 0) + 1
-        st.bar_chart(pd.DataFrame({"Count": list(type_counts.values())}, index=list(type_counts.keys())))
+        with chart_col1:
+            st.subheader("Rarity")
+            st.bar_chart(stats["rarity_df"])
     
-    # Quality histogram
-    st.subheader("Quality Distribution")
-    quality_brackets = {"Q1-20": 0, "Q21-40": 0, "Q41-60": 0, "Q61-80": 0, "Q81-100": 0}
+        with chart_col2:
+            st.subheader("Size")
+            st.bar_chart(stats["size_df"])
     
-    for c in st.session_state.generated_cards:
-        if c.quality <= 20:
-            quality_brackets["Q1-20"] += 1
-        elif c.quality <= 40:
-            quality_brackets["Q21-40"] += 1
-        elif c.quality <= 60:
-            quality_brackets["Q41-60"] += 1
-        elif c.quality <= 80:
-            quality_brackets["Q61-80"] += 1
-        else:
-            quality_brackets["Q81-100"] += 1
+        with chart_col3:
+            st.subheader("Type")
+            st.bar_chart(stats["type_df"])
     
-    st.bar_chart(pd.DataFrame({"Count": list(quality_brackets.values())}, index=list(quality_brackets.keys())))
-else:
-    st.info("👆 Generate your first card to see statistics!")
\ No newline at end of file
+        # Quality histogram
+        st.subheader("Quality Distribution")
+        st.bar_chart(stats["quality_df"])
+    else:
+        st.info("👆 Generate your first card to see statistics!")
+
+st.session_state.cards_df = history_frame("Resource Core", HISTORY_LIMIT, data_version())
+
+render_generator()
+render_history()
+render_stats(compute_stats("Resource Core", HISTORY_LIMIT, data_version()))
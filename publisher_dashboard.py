@@ -7,12 +7,10 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime
 from card_database import (
-    init_database, get_cards_by_state, get_state_stats,
-    update_card_state, bulk_update_states, can_transition
+    init_database, get_filtered_cards, get_filtered_state_counts, get_card, get_state_stats,
+    update_card_state, bulk_transition_where, is_valid_transition, data_version
 )
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from card_database import GeneratedCard, get_db_engine
+from utils import csv_bytes
 
 st.set_page_config(page_title="Publisher Dashboard", page_icon="📋", layout="wide")
 
@@ -21,6 +19,25 @@ if 'db_initialized' not in st.session_state:
     init_database()
     st.session_state.db_initialized = True
 
+STATE_EMOJI = {"draft": "📝", "published": "✅", "archived": "🗄️"}
+TYPE_EMOJI = {"Resource Core": "⚡", "Commander": "👑", "Unit": "🎖️"}
+
+# Cards per table page; only the current page is loaded from the database
+CARDS_PER_PAGE = 50
+
+# Database reads are cached until a write bumps the data version
+@st.cache_data(ttl=60, show_spinner=False)
+def get_state_stats_cached(version):
+    return get_state_stats()
+
+@st.cache_data(ttl=60, show_spinner=False)
+def get_filtered_state_counts_cached(states, card_types, search_id, version):
+    return get_filtered_state_counts(states, card_types, search_id)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def get_filtered_cards_cached(states, card_types, search_id, page, version):
+    return get_filtered_cards(states, card_types, search_id, limit=CARDS_PER_PAGE, offset=(page - 1) * CARDS_PER_PAGE)
+
 # Header
 st.title("📋 Publisher Dashboard")
 st.markdown("Manage card publishing workflow across all card types")
@@ -29,7 +46,7 @@ st.markdown("Manage card publishing workflow across all card types")
 st.markdown("---")
 col1, col2, col3, col4 = st.columns(4)
 
-stats = get_state_stats()
+stats = get_state_stats_cached(data_version())
 with col1:
     st.metric("📦 Total Cards", stats["total"])
 with col2:
@@ -39,201 +56,177 @@ with col3:
 with col4:
     st.metric("🗄️ Archived", stats["archived"])
 
-# Filters
-st.markdown("---")
-st.subheader("🔍 Filters")
+# Filters, card table, bulk actions and card management rerun on their own when a
+# filter changes; state changes call st.rerun() so the stats above refresh too
+@st.fragment
+def render_cards(stats):
+    # Filters
+    st.markdown("---")
+    st.subheader("🔍 Filters")
 
-filter_col1, filter_col2, filter_col3 = st.columns(3)
+    filter_col1, filter_col2, filter_col3 = st.columns(3)
 
-with filter_col1:
-    state_filter = st.multiselect(
-        "State",
-        ["draft", "published", "archived"],
-        default=["draft", "published"]
-    )
+    with filter_col1:
+        state_filter = st.multiselect(
+            "State",
+            ["draft", "published", "archived"],
+            default=["draft", "published"]
+        )
 
-with filter_col2:
-    # Get unique card types from stats
-    card_types = list(stats["by_type"].keys()) if stats["by_type"] else []
-    type_filter = st.multiselect(
-        "Card Type",
-        card_types,
-        default=card_types
-    )
+    with filter_col2:
+        # Get unique card types from stats
+        card_types = list(stats["by_type"].keys()) if stats["by_type"] else []
+        type_filter = st.multiselect(
+            "Card Type",
+            card_types,
+            default=card_types
+        )
 
-with filter_col3:
-    search_id = st.text_input("Search Card ID", placeholder="Enter hash ID...")
+    with filter_col3:
+        search_id = st.text_input("Search Card ID", placeholder="Enter hash ID...")
 
-# Get filtered cards from database
-try:
-    engine = get_db_engine()
-    if engine:
-        Session = sessionmaker(bind=engine)
-        session = Session()
-        
-        # Build query
-        query = session.query(GeneratedCard)
-        
-        if state_filter:
-            query = query.filter(GeneratedCard.state.in_(state_filter))
-        
-        if type_filter:
-            query = query.filter(GeneratedCard.card_type.in_(type_filter))
-        
-        if search_id:
-            query = query.filter(GeneratedCard.card_id.contains(search_id))
-        
-        filtered_cards = query.order_by(GeneratedCard.created_at.desc()).all()
-        session.close()
-    else:
-        filtered_cards = []
-except:
-    filtered_cards = []
+    # Per-state counts size the pager and the bulk actions; only the current page of cards is loaded
+    state_counts = get_filtered_state_counts_cached(state_filter, type_filter, search_id, data_version())
+    total_cards = sum(state_counts.values())
+    page_count = max(1, -(-total_cards // CARDS_PER_PAGE))
 
-# Display cards
-st.markdown("---")
-st.subheader(f"📚 Cards ({len(filtered_cards)})")
+    # Display cards
+    st.markdown("---")
+    st.subheader(f"📚 Cards ({total_cards})")
+    page = st.number_input("Page", min_value=1, max_value=page_count, value=1) if page_count > 1 else 1
+    filtered_cards = get_filtered_cards_cached(state_filter, type_filter, search_id, page, data_version())
+    if page_count > 1:
+        st.caption(f"Page {page} of {page_count}")
 
-if not filtered_cards:
-    st.info("No cards match your filters. Generate some cards first!")
-else:
-    # Create DataFrame for display
-    card_data = []
-    for card in filtered_cards:
-        # State emoji
-        state_emoji = {
-            "draft": "📝",
-            "published": "✅",
-            "archived": "🗄️"
-        }
-        
-        # Card type emoji
-        type_emoji = {
-            "Resource Core": "⚡",
-            "Commander": "👑",
-            "Unit": "🎖️"
-        }
-        
-        card_data.append({
-            "State": f"{state_emoji.get(card.state, '')} {card.state.title()}",
-            "Type": f"{type_emoji.get(card.card_type, '📦')} {card.card_type}",
-            "Card ID": card.card_id,
-            "Size": card.size,
-            "Resource": card.resource_type,
-            "Rarity": card.rarity,
-            "Tier": card.tier,
-            "Quality": card.quality,
-            "Score": round(card.score, 1),
-            "Created": card.created_at.strftime("%Y-%m-%d %H:%M") if card.created_at else "-",
-            "Published": card.published_at.strftime("%Y-%m-%d %H:%M") if card.published_at else "-",
+    if not filtered_cards:
+        st.info("No cards match your filters. Generate some cards first!")
+    else:
+        # Build the display table column by column; emoji and date formatting are vectorized
+        cards = pd.DataFrame.from_records(filtered_cards, columns=filtered_cards[0]._fields)
+        df = pd.DataFrame({
+            "State": cards["state"].map(STATE_EMOJI).fillna("") + " " + cards["state"].str.title(),
+            "Type": cards["card_type"].map(TYPE_EMOJI).fillna("📦") + " " + cards["card_type"],
+            "Card ID": cards["card_id"],
+            "Size": cards["size"],
+            "Resource": cards["resource_type"],
+            "Rarity": cards["rarity"],
+            "Tier": cards["tier"],
+            "Quality": cards["quality"],
+            "Score": cards["score"].round(1),
+            "Created": pd.to_datetime(cards["created_at"]).dt.strftime("%Y-%m-%d %H:%M").fillna("-"),
+            "Published": pd.to_datetime(cards["published_at"]).dt.strftime("%Y-%m-%d %H:%M").fillna("-"),
         })
     
-    # Display table
-    df = pd.DataFrame(card_data)
-    st.dataframe(
-        df,
-        use_container_width=True,
-        hide_index=True,
-        height=400
-    )
+        # Display table
+        st.dataframe(
+            df,
+            use_container_width=True,
+            hide_index=True,
+            height=400
+        )
     
-    # Bulk actions
-    st.markdown("---")
-    st.subheader("⚡ Bulk Actions")
+        # Bulk actions
+        st.markdown("---")
+        st.subheader("⚡ Bulk Actions")
     
-    bulk_col1, bulk_col2, bulk_col3 = st.columns(3)
+        bulk_col1, bulk_col2, bulk_col3 = st.columns(3)
     
-    with bulk_col1:
-        st.markdown("**Promote All Drafts**")
-        draft_cards = [c for c in filtered_cards if c.state == "draft"]
-        if st.button(f"📤 Publish {len(draft_cards)} Drafts", disabled=len(draft_cards) == 0):
-            if bulk_update_states([c.card_id for c in draft_cards], "published"):
-                st.success(f"✅ Published {len(draft_cards)} cards!")
-                st.rerun()
+        # Counts cover every matching card, not just this page; the buttons update the same set in SQL
+        with bulk_col1:
+            st.markdown("**Promote All Drafts**")
+            draft_count = state_counts.get("draft", 0)
+            if st.button(f"📤 Publish {draft_count} Drafts", disabled=draft_count == 0):
+                if bulk_transition_where("draft", "published", type_filter, search_id):
+                    st.success(f"✅ Published {draft_count} cards!")
+                    st.rerun()
     
-    with bulk_col2:
-        st.markdown("**Archive Published**")
-        published_cards = [c for c in filtered_cards if c.state == "published"]
-        if st.button(f"🗄️ Archive {len(published_cards)} Published", disabled=len(published_cards) == 0):
-            if bulk_update_states([c.card_id for c in published_cards], "archived"):
-                st.success(f"✅ Archived {len(published_cards)} cards!")
-                st.rerun()
+        with bulk_col2:
+            st.markdown("**Archive Published**")
+            published_count = state_counts.get("published", 0)
+            if st.button(f"🗄️ Archive {published_count} Published", disabled=published_count == 0):
+                if bulk_transition_where("published", "archived", type_filter, search_id):
+                    st.success(f"✅ Archived {published_count} cards!")
+                    st.rerun()
     
-    with bulk_col3:
-        st.markdown("**Export Data**")
-        if st.button("💾 Download CSV"):
-            csv = df.to_csv(index=False)
-            st.download_button(
-                label="📥 Download",
-                data=csv,
-                file_name=f"card_states_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                mime="text/csv"
-            )
+        with bulk_col3:
+            st.markdown("**Export Data**")
+            if st.button("💾 Download CSV"):
+                st.download_button(
+                    label="📥 Download",
+                    data=csv_bytes(df),
+                    file_name=f"card_states_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                    mime="text/csv"
+                )
 
-# Individual Card Management
-st.markdown("---")
-st.subheader("🎴 Manage Individual Card")
+    # Individual Card Management
+    st.markdown("---")
+    st.subheader("🎴 Manage Individual Card")
 
-manage_col1, manage_col2 = st.columns([2, 1])
+    manage_col1, manage_col2 = st.columns([2, 1])
 
-with manage_col1:
-    selected_card_id = st.selectbox(
-        "Select Card",
-        options=[c.card_id for c in filtered_cards],
-        format_func=lambda x: f"{x} - {next((c.state.title() for c in filtered_cards if c.card_id == x), '')}"
-    ) if filtered_cards else None
+    # Option labels looked up by ID instead of a scan of the page per option
+    state_by_id = {c.card_id: c.state for c in filtered_cards}
 
-if selected_card_id:
-    selected_card = next((c for c in filtered_cards if c.card_id == selected_card_id), None)
+    with manage_col1:
+        selected_card_id = st.selectbox(
+            "Select Card",
+            options=list(state_by_id),
+            format_func=lambda x: f"{x} - {state_by_id[x].title()}"
+        ) if filtered_cards else None
+
+    if selected_card_id:
+        # The table rows carry only displayed columns; load the full card for the detail view
+        selected_card = get_card(selected_card_id)
     
-    if selected_card:
-        with manage_col2:
-            st.markdown("**Current State**")
-            state_emoji = {"draft": "📝", "published": "✅", "archived": "🗄️"}
-            st.markdown(f"### {state_emoji.get(selected_card.state, '')} {selected_card.state.title()}")
+        if selected_card:
+            with manage_col2:
+                st.markdown("**Current State**")
+                st.markdown(f"### {STATE_EMOJI.get(selected_card.state, '')} {selected_card.state.title()}")
         
-        # Show card details
-        detail_col1, detail_col2, detail_col3 = st.columns(3)
+            # Show card details
+            detail_col1, detail_col2, detail_col3 = st.columns(3)
         
-        with detail_col1:
-            st.markdown("**Card Information**")
-            st.text(f"ID: {selected_card.card_id}")
-            st.text(f"Type: {selected_card.card_type}")
-            st.text(f"Size: {selected_card.size}")
-            st.text(f"Resource: {selected_card.resource_type}")
+            with detail_col1:
+                st.markdown("**Card Information**")
+                st.text(f"ID: {selected_card.card_id}")
+                st.text(f"Type: {selected_card.card_type}")
+                st.text(f"Size: {selected_card.size}")
+                st.text(f"Resource: {selected_card.resource_type}")
         
-        with detail_col2:
-            st.markdown("**Stats**")
-            st.text(f"Rarity: {selected_card.rarity}")
-            st.text(f"Tier: {selected_card.tier}")
-            st.text(f"Quality: {selected_card.quality}")
-            st.text(f"Score: {selected_card.score:.1f}")
+            with detail_col2:
+                st.markdown("**Stats**")
+                st.text(f"Rarity: {selected_card.rarity}")
+                st.text(f"Tier: {selected_card.tier}")
+                st.text(f"Quality: {selected_card.quality}")
+                st.text(f"Score: {selected_card.score:.1f}" if selected_card.score is not None else "Score: -")
         
-        with detail_col3:
-            st.markdown("**Timeline**")
-            st.text(f"Created: {selected_card.created_at.strftime('%Y-%m-%d %H:%M')}" if selected_card.created_at else "Created: -")
-            if selected_card.published_at:
-                st.text(f"✅ Published: {selected_card.published_at.strftime('%Y-%m-%d %H:%M')}")
-            if selected_card.archived_at:
-                st.text(f"🗄️ Archived: {selected_card.archived_at.strftime('%Y-%m-%d %H:%M')}")
+            with detail_col3:
+                st.markdown("**Timeline**")
+                st.text(f"Created: {selected_card.created_at.strftime('%Y-%m-%d %H:%M')}" if selected_card.created_at else "Created: -")
+                if selected_card.published_at:
+                    st.text(f"✅ Published: {selected_card.published_at.strftime('%Y-%m-%d %H:%M')}")
+                if selected_card.archived_at:
+                    st.text(f"🗄️ Archived: {selected_card.archived_at.strftime('%Y-%m-%d %H:%M')}")
         
-        # State transition buttons
-        st.markdown("**Available Actions**")
-        action_col1, action_col2, action_col3 = st.columns(3)
+            # State transition buttons (checked against the loaded state; update_card_state re-checks in SQL)
+            st.markdown("**Available Actions**")
+            action_col1, action_col2, action_col3 = st.columns(3)
         
-        with action_col1:
-            if can_transition(selected_card_id, "published"):
-                if st.button("📤 Promote to Published", use_container_width=True):
-                    if update_card_state(selected_card_id, "published"):
-                        st.success("✅ Card published!")
-                        st.rerun()
+            with action_col1:
+                if is_valid_transition(selected_card.state, "published"):
+                    if st.button("📤 Promote to Published", use_container_width=True):
+                        if update_card_state(selected_card_id, "published"):
+                            st.success("✅ Card published!")
+                            st.rerun()
         
-        with action_col2:
-            if can_transition(selected_card_id, "archived"):
-                if st.button("🗄️ Archive Card", use_container_width=True):
-                    if update_card_state(selected_card_id, "archived"):
-                        st.success("✅ Card archived!")
-                        st.rerun()
+            with action_col2:
+                if is_valid_transition(selected_card.state, "archived"):
+                    if st.button("🗄️ Archive Card", use_container_width=True):
+                        if update_card_state(selected_card_id, "archived"):
+                            st.success("✅ Card archived!")
+                            st.rerun()
+
+render_cards(stats)
 
 # Workflow Reference
 with st.expander("ℹ️ Publishing Workflow Reference"):
@@ -6,14 +6,23 @@ Date: October 28, 2025
 10-Tier, 100-Point Quality System with Weighted Stat Rolls
 """
 
+import math
 import random
 import hashlib
-from datetime import datetime
+import struct
+import time
 from dataclasses import dataclass, field
-from typing import Tuple
+from typing import Optional, Tuple, Union
 
+import numpy as np
+import pandas as pd
 
-@dataclass
+
+# Packed stats + nanosecond timestamp hashed into the card ID (strings are padded/cut to 10 bytes)
+_ID_PAYLOAD = struct.Struct("<10s6h10sq")
+
+
+@dataclass(slots=True)
 class ResourceCore:
     """Generated Resource Core with all stats"""
     size: str  # Small, Medium, Large, Massive
@@ -26,12 +35,22 @@ class ResourceCore:
     resource_type: str  # Energy, Matter, Signal, Life, Omni
     rarity: str  # Common, Uncommon, Rare, Epic, Legendary
     card_id: str = field(default="")  # Unique hash ID
+    weight: Optional[float] = None  # Stat-roll weight, see calculate_weight
+    score: Optional[float] = None  # Rarity score, see calculate_score
     
     def __post_init__(self):
-        """Generate unique hash ID if not provided"""
+        """Generate unique hash ID and fill weight / score if not provided"""
+        if self.weight is None:
+            self.weight = calculate_weight(self.tier, self.quality)
+        if self.score is None:
+            self.score = calculate_score(self.tier, self.quality)
         if not self.card_id:
-            core_data = f"{self.size}{self.tier}{self.quality}{self.cost}{self.rpt}{self.hp}{self.links}{self.resource_type}{datetime.now().isoformat()}"
-            self.card_id = hashlib.sha256(core_data.encode()).hexdigest()[:12]
+            core_data = _ID_PAYLOAD.pack(
+                self.size.encode(), self.tier, self.quality, self.cost, self.rpt, self.hp, self.links,
+                self.resource_type.encode(), time.time_ns()
+            )
+            # A 6-byte BLAKE2b digest is exactly the 12 hex chars the ID needs
+            self.card_id = hashlib.blake2b(core_data, digest_size=6).hexdigest()
 
 
 # Core size stat ranges
@@ -63,7 +82,7 @@ CORE_RANGES = {
 }
 
 
-def roll_tier() -> int:
+def roll_tier(size: Optional[str] = None) -> int:
     """
     Roll a tier from 1-10 where higher tiers are exponentially rarer.
     Tier 10 is 10x harder to roll than Tier 1.
@@ -73,10 +92,48 @@ def roll_tier() -> int:
     - Tier 2: weight = 9
     - ...
     - Tier 10: weight = 1
+    
+    If size is given, only the tiers that map to that size are rolled
+    (same relative weights), i.e. the tier distribution conditioned on size.
+    """
+    tiers = TIERS_BY_SIZE[size] if size else TIERS
+    return tiers[_alias_draw(*TIER_ALIAS[size])]
+
+
+def _build_alias(weights: list) -> Tuple[list, list]:
     """
-    weights = [11 - i for i in range(1, 11)]  # [10, 9, 8, ..., 1]
-    tier = random.choices(range(1, 11), weights=weights, k=1)[0]
-    return tier
+    Build Vose alias tables for drawing index i with probability weights[i] / sum(weights).
+    
+    Each slot keeps its own index with probability prob[i], otherwise it
+    yields alias[i], so a draw costs one uniform and one comparison.
+    """
+    n = len(weights)
+    total = sum(weights)
+    prob = [w * n / total for w in weights]
+    alias = list(range(n))
+    small = [i for i, p in enumerate(prob) if p < 1]
+    large = [i for i, p in enumerate(prob) if p >= 1]
+    while small and large:
+        less, more = small.pop(), large.pop()
+        alias[less] = more
+        prob[more] -= 1 - prob[less]
+        (small if prob[more] < 1 else large).append(more)
+    # Leftovers are full slots (up to float rounding)
+    for i in small + large:
+        prob[i] = 1.0
+    return prob, alias
+
+
+def _alias_draw(prob: list, alias: list) -> int:
+    """Draw an index from alias tables; the integer part of one uniform picks the slot, the fraction decides it"""
+    x = random.random() * len(prob)
+    i = int(x)
+    return i if x - i < prob[i] else alias[i]
+
+
+# Quality values and their alias tables (weights [100, 99, ..., 1]), built once
+QUALITY_VALUES = range(1, 101)
+QUALITY_ALIAS = _build_alias([101 - i for i in QUALITY_VALUES])
 
 
 def roll_quality() -> int:
@@ -86,9 +143,7 @@ def roll_quality() -> int:
     
     Uses inverse probability weighting.
     """
-    weights = [101 - i for i in range(1, 101)]  # [100, 99, 98, ..., 1]
-    quality = random.choices(range(1, 101), weights=weights, k=1)[0]
-    return quality
+    return QUALITY_VALUES[_alias_draw(*QUALITY_ALIAS)]
 
 
 def calculate_weight(tier: int, quality: int) -> float:
@@ -104,6 +159,15 @@ def calculate_weight(tier: int, quality: int) -> float:
     return (tier / 10.0) * (quality / 100.0)
 
 
+def calculate_score(tier: int, quality: int) -> float:
+    """
+    Calculate the rarity score from tier and quality.
+    
+    Score formula: (quality * 0.7) + (tier * 3)
+    """
+    return (quality * 0.7) + (tier * 3)
+
+
 def weighted_roll(min_val: int, max_val: int, weight: float) -> int:
     """
     Roll a value between min_val and max_val, weighted by the quality/tier weight.
@@ -113,18 +177,39 @@ def weighted_roll(min_val: int, max_val: int, weight: float) -> int:
     
     Uses weighted random selection across the range.
     """
-    if min_val == max_val:
-        return min_val
-    
-    range_size = max_val - min_val + 1
-    values = list(range(min_val, max_val + 1))
+    return roll_stats(((min_val, max_val),), weight)[0]
+
+
+def roll_stats(ranges: Tuple[Tuple[int, int], ...], weight: float) -> Tuple[int, ...]:
+    """
+    Roll several stats with the same weight in one call, e.g. cost, rpt, hp and links.
     
-    # Create weights that favor higher values based on weight parameter
+    Each (min_val, max_val) range is rolled as in weighted_roll; the weight
+    terms are computed once and shared by all the rolls.
+    """
+    # Value i (0-based) has weight 1 + i*b, favoring higher values as weight grows
     # weight=0.01 → heavily favor min
     # weight=1.0 → heavily favor max
-    weights = [1 + (i * weight * 10) for i in range(range_size)]
-    
-    return random.choices(values, weights=weights, k=1)[0]
+    b = weight * 10
+    a = 1 - b / 2
+    a2 = a * a
+    rolls = []
+    for min_val, max_val in ranges:
+        if min_val == max_val:
+            rolls.append(min_val)
+            continue
+        
+        # The first k weights sum to k + b*k*(k-1)/2, so the drawn value is the
+        # inverse of that quadratic at a uniform draw; no weight lists needed
+        range_size = max_val - min_val + 1
+        u = random.random() * (range_size + b * range_size * (range_size - 1) / 2)
+        index = int((math.sqrt(a2 + 2 * b * u) - a) / b) if b else int(u)
+        rolls.append(min_val + min(index, range_size - 1))
+    return tuple(rolls)
+
+
+# Core size for each tier, indexed by tier - 1
+SIZE_FOR_TIER = ("Small",) * 3 + ("Medium",) * 3 + ("Large",) * 2 + ("Massive",) * 2
 
 
 def determine_size_from_tier(tier: int) -> str:
@@ -136,17 +221,30 @@ def determine_size_from_tier(tier: int) -> str:
     Tier 7-8: Large
     Tier 9-10: Massive
     """
-    if tier <= 3:
-        return "Small"
-    elif tier <= 6:
-        return "Medium"
-    elif tier <= 8:
-        return "Large"
-    else:
-        return "Massive"
+    # Guard explicitly: a negative index would silently wrap to the other end of the table
+    if not 1 <= tier <= len(SIZE_FOR_TIER):
+        raise ValueError(f"tier must be between 1 and {len(SIZE_FOR_TIER)}, got {tier}")
+    return SIZE_FOR_TIER[tier - 1]
 
 
-def determine_rarity(tier: int, quality: int) -> str:
+# Tiers that produce each core size (see determine_size_from_tier)
+TIERS_BY_SIZE = {
+    size: [tier for tier in range(1, 11) if determine_size_from_tier(tier) == size]
+    for size in CORE_RANGES
+}
+
+# Alias tables of the tier weights (11 - tier) for roll_tier, per size and for any size (None)
+TIERS = range(1, 11)
+TIER_ALIAS = {
+    size: _build_alias([11 - tier for tier in tiers])
+    for size, tiers in [(None, TIERS), *TIERS_BY_SIZE.items()]
+}
+
+# (min, max) of cost, rpt, hp and links for each tier's size, indexed by tier - 1
+RANGES_FOR_TIER = tuple(tuple(CORE_RANGES[size].values()) for size in SIZE_FOR_TIER)
+
+
+def determine_rarity(tier: int, quality: int, score: Optional[float] = None) -> str:
     """
     Determine rarity based on quality score and tier.
     
@@ -161,8 +259,11 @@ def determine_rarity(tier: int, quality: int) -> str:
     Rare: Strong rolls (~10-15%)
     Uncommon: Decent rolls (~25-35%)
     Common: Everything else (~40-50%)
+    
+    Pass score if it is already known to skip recomputing it.
     """
-    score = (quality * 0.7) + (tier * 3)
+    if score is None:
+        score = calculate_score(tier, quality)
     
     if score >= 98:
         return "Legendary"  # 🟡 Only the absolute best
@@ -176,10 +277,13 @@ def determine_rarity(tier: int, quality: int) -> str:
         return "Common"  # ⚪ Everything else
 
 
-def generate_resource_core(resource_type: str = "Energy") -> ResourceCore:
+def generate_resource_core(resource_type: str = "Energy", size: Optional[str] = None) -> ResourceCore:
     """
     Generate a complete Resource Core using the tier/quality weighted system.
     
+    Pass size to generate a core of that size directly: the tier is rolled
+    only among the tiers for that size, so no re-rolling is needed.
+    
     Process:
     1. Roll tier (1-10, exponentially harder)
     2. Roll quality (1-100, exponentially harder)
@@ -189,7 +293,7 @@ def generate_resource_core(resource_type: str = "Energy") -> ResourceCore:
     6. Determine rarity from tier + quality (OUTPUT)
     """
     # Step 1: Roll tier and quality
-    tier = roll_tier()
+    tier = roll_tier(size)
     quality = roll_quality()
     
     # Step 2: Calculate combined weight
@@ -197,16 +301,14 @@ def generate_resource_core(resource_type: str = "Energy") -> ResourceCore:
     
     # Step 3: Determine size from tier
     size = determine_size_from_tier(tier)
-    ranges = CORE_RANGES[size]
+    ranges = RANGES_FOR_TIER[tier - 1]
     
     # Step 4: Roll stats using weight
-    cost = weighted_roll(ranges["cost"][0], ranges["cost"][1], weight)
-    rpt = weighted_roll(ranges["rpt"][0], ranges["rpt"][1], weight)
-    hp = weighted_roll(ranges["hp"][0], ranges["hp"][1], weight)
-    links = weighted_roll(ranges["links"][0], ranges["links"][1], weight)
+    cost, rpt, hp, links = roll_stats(ranges, weight)
     
     # Step 5: Determine rarity (OUTPUT based on tier + quality)
-    rarity = determine_rarity(tier, quality)
+    score = calculate_score(tier, quality)
+    rarity = determine_rarity(tier, quality, score)
     
     return ResourceCore(
         size=size,
@@ -217,27 +319,30 @@ def generate_resource_core(resource_type: str = "Energy") -> ResourceCore:
         hp=hp,
         links=links,
         resource_type=resource_type,
-        rarity=rarity
+        rarity=rarity,
+        weight=weight,
+        score=score
     )
 
 
+RARITY_EMOJI = {
+    "Common": "⚪",
+    "Uncommon": "🔵",
+    "Rare": "🔵",
+    "Epic": "🟣",
+    "Legendary": "🟡"
+}
+
+
 def print_card(core: ResourceCore) -> None:
     """Pretty print a generated card"""
-    rarity_colors = {
-        "Common": "⚪",
-        "Uncommon": "🔵",
-        "Rare": "🔵",
-        "Epic": "🟣",
-        "Legendary": "🟡"
-    }
-    
-    rarity_symbol = rarity_colors.get(core.rarity, "")
+    rarity_symbol = RARITY_EMOJI.get(core.rarity, "")
     
     print(f"\n{'='*50}")
     print(f"{core.size} {core.resource_type} Core")
     print(f"Card ID: {core.card_id}")
     print(f"Tier {core.tier} | Quality {core.quality} | {rarity_symbol} {core.rarity.upper()}")
-    print(f"Weight: {calculate_weight(core.tier, core.quality):.3f} | Score: {(core.quality * 0.7) + (core.tier * 3):.1f}")
+    print(f"Weight: {core.weight:.3f} | Score: {core.score:.1f}")
     print(f"{'='*50}")
     print(f"Cost: {core.cost}")
     print(f"RPT: {core.rpt}")
@@ -247,79 +352,156 @@ def print_card(core: ResourceCore) -> None:
 
 
 def generate_batch(count: int = 10, resource_type: str = "Energy") -> list[ResourceCore]:
-    """Generate a batch of Resource Cores"""
-    return [generate_resource_core(resource_type) for _ in range(count)]
+    """Generate a batch of Resource Cores (rolled together by generate_resource_core_batch)"""
+    return cores_from_frame(generate_resource_core_batch(count, resource_type))
+
+
+def cores_from_frame(df: pd.DataFrame) -> list[ResourceCore]:
+    """Turn rows of a generate_resource_core_batch frame into ResourceCore objects"""
+    return [ResourceCore(**row) for row in df.to_dict("records")]
+
+
+# Rarity score thresholds (see determine_rarity), lowest first
+RARITY_THRESHOLDS = np.array([55, 75, 90, 98])
+RARITY_NAMES = np.array(["Common", "Uncommon", "Rare", "Epic", "Legendary"], dtype=object)
+QUALITIES = np.arange(1, 101)
+
+# Sizes as integer codes into SIZE_NAMES, and each size's stat ranges as (size, stat) tables,
+# so the batch path indexes arrays instead of comparing size strings
+SIZE_NAMES = np.array(list(CORE_RANGES), dtype=object)
+SIZE_CODE_BY_TIER = np.array([0] + [list(CORE_RANGES).index(determine_size_from_tier(tier)) for tier in TIERS])
+STAT_NAMES = ("cost", "rpt", "hp", "links")
+STAT_MINS = np.array([[ranges[stat][0] for stat in STAT_NAMES] for ranges in CORE_RANGES.values()])
+STAT_MAXS = np.array([[ranges[stat][1] for stat in STAT_NAMES] for ranges in CORE_RANGES.values()])
+
+
+def _vector_choice(values: np.ndarray, weights: np.ndarray, u: np.ndarray) -> np.ndarray:
+    """Vectorized random.choices: one draw of values with fixed weights per pre-drawn uniform in u"""
+    cdf = np.cumsum(weights) / weights.sum()
+    idx = np.searchsorted(cdf, u, side="right")
+    return values[np.minimum(idx, len(values) - 1)]
+
+
+def _vector_weighted_roll(min_val: np.ndarray, max_val: np.ndarray, weight: np.ndarray, u: np.ndarray) -> np.ndarray:
+    """Vectorized weighted_roll: one draw per element from its pre-drawn uniform, each with its own range and weight"""
+    # Same closed-form inverse of the cumulative weights 1 + i*b as weighted_roll;
+    # single-value ranges need no special case since the index is clamped to 0
+    range_size = max_val - min_val + 1
+    b = weight * 10
+    draw = u * (range_size + b * range_size * (range_size - 1) / 2)
+    a = 1 - b / 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        idx = np.where(b > 0, (np.sqrt(a * a + 2 * b * draw) - a) / b, draw)
+    return min_val + np.minimum(idx.astype(np.int64), range_size - 1)
+
+
+def generate_resource_core_batch(n: int, resource_type: str = "Energy", size: Optional[str] = None) -> pd.DataFrame:
+    """
+    Generate n Resource Cores at once with NumPy.
+    
+    Same distributions as generate_resource_core, but every roll is drawn
+    for the whole batch in one call. Returns one row per core with the
+    ResourceCore field names as columns, so df.itertuples(index=False)
+    can be passed straight to save_cards_bulk.
+    """
+    rng = np.random.default_rng()
+    
+    # All uniforms up front: one row each for tier, quality and the four stats
+    u = rng.random((6, n))
+    
+    # Tier and quality
+    tiers = np.array(TIERS_BY_SIZE[size] if size else TIERS)
+    tier = _vector_choice(tiers, 11 - tiers, u[0])
+    quality = _vector_choice(QUALITIES, 101 - QUALITIES, u[1])
+    weight = (tier / 10.0) * (quality / 100.0)
+    size_code = SIZE_CODE_BY_TIER[tier]
+    
+    # All four stats of every row in one call; each row's ranges come from its size code
+    stats = _vector_weighted_roll(STAT_MINS[size_code].T, STAT_MAXS[size_code].T, weight, u[2:]).astype(np.int16)
+    
+    # Rarity (OUTPUT based on tier + quality)
+    score = (quality * 0.7) + (tier * 3)
+    rarity = RARITY_NAMES[np.searchsorted(RARITY_THRESHOLDS, score, side="right")]
+    
+    # Random 12-hex IDs, split by viewing the hex string as fixed-width 12-byte records;
+    # hashing each row's stats would need a Python loop
+    card_ids = np.frombuffer(rng.bytes(6 * n).hex().encode(), dtype="S12").astype(str)
+    
+    return pd.DataFrame({
+        "size": SIZE_NAMES[size_code],
+        "tier": tier.astype(np.int16),
+        "quality": quality.astype(np.int16),
+        **dict(zip(STAT_NAMES, stats)),
+        "resource_type": resource_type,
+        "rarity": rarity,
+        "card_id": card_ids
+    })
 
 
-def analyze_batch(cores: list[ResourceCore]) -> None:
-    """Analyze statistics from a batch of generated cores"""
+def analyze_batch(cores: Union[list[ResourceCore], pd.DataFrame]) -> None:
+    """
+    Analyze statistics from a batch of generated cores.
+    
+    Accepts a list of cores or a generate_resource_core_batch frame; the
+    frame already holds one array per field, so nothing is extracted.
+    """
     print(f"\n{'='*50}")
     print(f"BATCH ANALYSIS ({len(cores)} cards)")
     print(f"{'='*50}")
     
+    # One array per field; every section below is an array reduction
+    n = len(cores)
+    stats = ("tier", "quality", "cost", "rpt", "hp", "links")
+    if isinstance(cores, pd.DataFrame):
+        tiers, qualities, costs, rpts, hps, links = (cores[stat].to_numpy() for stat in stats)
+        sizes = cores["size"].to_numpy()
+    else:
+        tiers, qualities, costs, rpts, hps, links = (
+            np.fromiter((getattr(core, stat) for core in cores), dtype=np.int16, count=n)
+            for stat in stats
+        )
+        sizes = np.array([core.size for core in cores], dtype=object)
+    
     # Tier distribution
-    tier_counts = {}
-    for core in cores:
-        tier_counts[core.tier] = tier_counts.get(core.tier, 0) + 1
+    tier_counts = np.bincount(tiers, minlength=11)
     
     print("\nTier Distribution:")
-    for tier in sorted(tier_counts.keys()):
+    for tier in np.flatnonzero(tier_counts):
         count = tier_counts[tier]
-        pct = (count / len(cores)) * 100
+        pct = (count / n) * 100
         print(f"  Tier {tier:2d}: {count:3d} cards ({pct:5.1f}%)")
     
-    # Size distribution
-    size_counts = {}
-    for core in cores:
-        size_counts[core.size] = size_counts.get(core.size, 0) + 1
+    # Size codes once; the size counts and per-size stat sums are then one bincount each
+    size_codes = pd.Categorical(sizes, categories=SIZE_NAMES).codes
+    size_counts = np.bincount(size_codes, minlength=len(SIZE_NAMES))
+    stat_sums = [np.bincount(size_codes, weights=stat, minlength=len(SIZE_NAMES)) for stat in (costs, rpts, hps, links)]
     
+    # Size distribution
     print("\nSize Distribution:")
-    for size in ["Small", "Medium", "Large", "Massive"]:
-        count = size_counts.get(size, 0)
-        pct = (count / len(cores)) * 100
+    for size, count in zip(SIZE_NAMES, size_counts):
+        pct = (count / n) * 100
         print(f"  {size:7s}: {count:3d} cards ({pct:5.1f}%)")
     
-    # Quality brackets
-    quality_brackets = {
-        "1-20": 0,
-        "21-40": 0,
-        "41-60": 0,
-        "61-80": 0,
-        "81-100": 0
-    }
-    
-    for core in cores:
-        if core.quality <= 20:
-            quality_brackets["1-20"] += 1
-        elif core.quality <= 40:
-            quality_brackets["21-40"] += 1
-        elif core.quality <= 60:
-            quality_brackets["41-60"] += 1
-        elif core.quality <= 80:
-            quality_brackets["61-80"] += 1
-        else:
-            quality_brackets["81-100"] += 1
+    # Quality brackets: bracket index per card from the bin edges, then one histogram pass
+    quality_counts = np.bincount(np.digitize(qualities, [21, 41, 61, 81]), minlength=5)
     
     print("\nQuality Distribution:")
-    for bracket, count in quality_brackets.items():
-        pct = (count / len(cores)) * 100
+    for bracket, count in zip(["1-20", "21-40", "41-60", "61-80", "81-100"], quality_counts):
+        pct = (count / n) * 100
         print(f"  Q{bracket:7s}: {count:3d} cards ({pct:5.1f}%)")
     
     # God rolls (Tier 9-10, Quality 90+)
-    god_rolls = [c for c in cores if c.tier >= 9 and c.quality >= 90]
-    print(f"\nGod Rolls (T9-10, Q90+): {len(god_rolls)} ({len(god_rolls)/len(cores)*100:.2f}%)")
+    god_rolls = int(((tiers >= 9) & (qualities >= 90)).sum())
+    print(f"\nGod Rolls (T9-10, Q90+): {god_rolls} ({god_rolls/n*100:.2f}%)")
     
     # Average stats by size
     print("\nAverage Stats by Size:")
-    for size in ["Small", "Medium", "Large", "Massive"]:
-        size_cores = [c for c in cores if c.size == size]
-        if not size_cores:
+    for code, size in enumerate(SIZE_NAMES):
+        count = size_counts[code]
+        if not count:
             continue
         
-        avg_cost = sum(c.cost for c in size_cores) / len(size_cores)
-        avg_rpt = sum(c.rpt for c in size_cores) / len(size_cores)
-        avg_hp = sum(c.hp for c in size_cores) / len(size_cores)
-        avg_links = sum(c.links for c in size_cores) / len(size_cores)
+        avg_cost, avg_rpt, avg_hp, avg_links = (sums[code] / count for sums in stat_sums)
         
         print(f"  {size:7s}: Cost {avg_cost:.1f} | RPT {avg_rpt:.1f} | HP {avg_hp:.1f} | Links {avg_links:.1f}")
 
@@ -337,15 +519,15 @@ if __name__ == "__main__":
     
     # Generate and analyze a large batch
     print("\n\n>>> GENERATING 1000 CARDS FOR ANALYSIS <<<")
-    batch = generate_batch(1000, "Energy")
+    batch = generate_resource_core_batch(1000, "Energy")
     analyze_batch(batch)
     
     # Show some extreme examples
     print("\n\n>>> EXTREME EXAMPLES <<<")
     
-    # Find best and worst in batch
-    best = max(batch, key=lambda c: calculate_weight(c.tier, c.quality))
-    worst = min(batch, key=lambda c: calculate_weight(c.tier, c.quality))
+    # Find best and worst in batch; only those two rows become ResourceCore objects
+    weights = calculate_weight(batch["tier"], batch["quality"])
+    best, worst = cores_from_frame(batch.loc[[weights.idxmax(), weights.idxmin()]])
     
     print("\nBEST ROLL:")
     print_card(best)
@@ -4,8 +4,9 @@ Integrated with card state management system
 """
 
 import streamlit as st
-import pandas as pd
 import hashlib
+from collections import Counter, deque
+from itertools import islice
 from datetime import datetime
 from card_state_manager import CardStateManager
 
@@ -14,6 +15,27 @@ from card_state_manager import CardStateManager
 
 st.set_page_config(page_title="Resource Generator", page_icon="⚡", layout="wide")
 
+RARITY_EMOJI = {
+    "Common": "⚪",
+    "Uncommon": "🔵",
+    "Rare": "🔵",
+    "Epic": "🟣",
+    "Legendary": "🟡"
+}
+
+STATE_EMOJI = {
+    "draft": "📝",
+    "published": "✅",
+    "archived": "🗄️"
+}
+
+# Session history keeps the newest cards first; older ones fall off the end
+HISTORY_LIMIT = 100
+HISTORY_COLUMNS = ["State", "Rarity", "Size", "Type", "ID", "T", "Q", "Cost", "RPT", "HP", "Links"]
+STAT_COLUMNS = ["T", "Q", "Cost", "RPT", "HP", "Links"]
+SIZES = ["Small", "Medium", "Large", "Massive"]
+RESOURCE_TYPES = ["Energy", "Matter", "Signal", "Life", "Omni"]
+
 # Initialize state manager
 @st.cache_resource
 def get_state_manager():
@@ -34,13 +56,13 @@ with left_col:
     # Size selector
     core_size = st.selectbox(
         "Core Size",
-        ["Small", "Medium", "Large", "Massive"]
+        SIZES
     )
     
     # Resource type selector
     resource_type = st.selectbox(
         "Resource Type",
-        ["Energy", "Matter", "Signal", "Life", "Omni"]
+        RESOURCE_TYPES
     )
     
     # Generate button
@@ -63,14 +85,14 @@ with left_col:
         
         # Generate hash ID
         hash_input = f"{core_data['size']}{core_data['tier']}{core_data['quality']}{core_data['cost']}{core_data['rpt']}{core_data['hp']}{core_data['links']}{core_data['resource_type']}{datetime.now().isoformat()}"
-        card_hash = hashlib.sha256(hash_input.encode()).hexdigest()[:12]
+        card_hash = hashlib.blake2b(hash_input.encode(), digest_size=6).hexdigest()
         
         # Store in session
         if 'generated_cards' not in st.session_state:
-            st.session_state.generated_cards = []
+            st.session_state.generated_cards = deque(maxlen=HISTORY_LIMIT)
         
         card_with_id = {**core_data, "card_id": card_hash, "created_at": datetime.now().isoformat()}
-        st.session_state.generated_cards.insert(0, card_with_id)
+        st.session_state.generated_cards.appendleft(card_with_id)
         
         # Auto-create draft state
         manager.create_card_state(
@@ -91,24 +113,11 @@ with left_col:
         
         # Get state
         card_state = manager.get_card_state(recent['card_id'])
-        state_emoji = {
-            "draft": "📝",
-            "published": "✅",
-            "archived": "🗄️"
-        }
-        
-        rarity_emoji = {
-            "Common": "⚪",
-            "Uncommon": "🔵",
-            "Rare": "🔵",
-            "Epic": "🟣",
-            "Legendary": "🟡"
-        }
-        
+
         # Card display
-        st.markdown(f"**{rarity_emoji.get(recent['rarity'], '')} {recent['size']} {recent['resource_type']} Core**")
+        st.markdown(f"**{RARITY_EMOJI.get(recent['rarity'], '')} {recent['size']} {recent['resource_type']} Core**")
         st.text(f"ID: {recent['card_id']}")
-        st.text(f"State: {state_emoji.get(card_state.state if card_state else 'draft', '📝')} {card_state.state.title() if card_state else 'Draft'}")
+        st.text(f"State: {STATE_EMOJI.get(card_state.state if card_state else 'draft', '📝')} {card_state.state.title() if card_state else 'Draft'}")
         st.text(f"{recent['rarity']} | T{recent['tier']} Q{recent['quality']}")
         
         st.markdown("**Stats**")
@@ -134,45 +143,42 @@ with left_col:
                     st.success("✅ Card archived!")
                     st.rerun()
 
+# Every history card's state, looked up once for both the table and the sidebar
+history = st.session_state.get('generated_cards')
+card_states = manager.get_card_states([card['card_id'] for card in history]) if history else {}
+
 with right_col:
     st.subheader("📊 Generation History")
     
     # Show session history
     if 'generated_cards' in st.session_state and st.session_state.generated_cards:
-        # Create DataFrame
-        history_data = []
-        for card in st.session_state.generated_cards[:50]:  # Last 50
-            card_state = manager.get_card_state(card['card_id'])
-            
-            rarity_emoji = {
-                "Common": "⚪",
-                "Uncommon": "🔵",
-                "Rare": "🔵",
-                "Epic": "🟣",
-                "Legendary": "🟡"
-            }
-            
-            state_emoji = {
-                "draft": "📝",
-                "published": "✅",
-                "archived": "🗄️"
-            }
+        # pandas is only needed once there is history to show; keep it off the first render
+        import pandas as pd
+        
+        # Rows as tuples against a fixed column list; pandas has no per-row dict keys to infer from
+        history_rows = []
+        for card in islice(st.session_state.generated_cards, 50):  # Last 50
+            card_state = card_states.get(card['card_id'])
             
-            history_data.append({
-                "State": f"{state_emoji.get(card_state.state if card_state else 'draft', '📝')}",
-                "Rarity": f"{rarity_emoji.get(card['rarity'], '')}",
-                "Size": card['size'],
-                "Type": card['resource_type'],
-                "ID": card['card_id'][:8] + "...",
-                "T": card['tier'],
-                "Q": card['quality'],
-                "Cost": card['cost'],
-                "RPT": card['rpt'],
-                "HP": card['hp'],
-                "Links": card['links']
-            })
-        
-        df = pd.DataFrame(history_data)
+            history_rows.append((
+                STATE_EMOJI.get(card_state.state if card_state else 'draft', '📝'),
+                RARITY_EMOJI.get(card['rarity'], ''),
+                card['size'],
+                card['resource_type'],
+                card['card_id'][:8] + "...",
+                card['tier'],
+                card['quality'],
+                card['cost'],
+                card['rpt'],
+                card['hp'],
+                card['links']
+            ))
+        
+        df = pd.DataFrame.from_records(history_rows, columns=HISTORY_COLUMNS)
+        # Small fixed vocabularies as categoricals and small ints: less memory to build and render
+        df["Size"] = pd.Categorical(df["Size"], categories=SIZES, ordered=True)
+        df["Type"] = pd.Categorical(df["Type"], categories=RESOURCE_TYPES)
+        df[STAT_COLUMNS] = df[STAT_COLUMNS].astype("int16")
         st.dataframe(
             df,
             use_container_width=True,
@@ -185,7 +191,7 @@ with right_col:
         
         with action_col1:
             if st.button("🗑️ Clear History"):
-                st.session_state.generated_cards = []
+                st.session_state.generated_cards.clear()
                 st.rerun()
         
         with action_col2:
@@ -207,42 +213,30 @@ with st.sidebar:
     if 'generated_cards' in st.session_state and st.session_state.generated_cards:
         cards = st.session_state.generated_cards
         
-        # Rarity breakdown
-        st.subheader("Rarity Distribution")
-        rarity_counts = {}
+        # One pass over the history fills every breakdown
+        rarity_counts = Counter()
+        state_counts = Counter()
+        type_counts = Counter()
         for card in cards:
-            rarity = card['rarity']
-            rarity_counts[rarity] = rarity_counts.get(rarity, 0) + 1
+            rarity_counts[card['rarity']] += 1
+            type_counts[card['resource_type']] += 1
+            card_state = card_states.get(card['card_id'])
+            if card_state:
+                state_counts[card_state.state] += 1
         
+        # Rarity breakdown
+        st.subheader("Rarity Distribution")
         for rarity, count in sorted(rarity_counts.items()):
-            rarity_emoji = {
-                "Common": "⚪",
-                "Uncommon": "🔵",
-                "Rare": "🔵",
-                "Epic": "🟣",
-                "Legendary": "🟡"
-            }
-            st.text(f"{rarity_emoji.get(rarity, '')} {rarity}: {count}")
+            st.text(f"{RARITY_EMOJI.get(rarity, '')} {rarity}: {count}")
         
         # State breakdown
         st.subheader("Publishing States")
-        state_counts = {"draft": 0, "published": 0, "archived": 0}
-        for card in cards:
-            card_state = manager.get_card_state(card['card_id'])
-            if card_state:
-                state_counts[card_state.state] += 1
-        
         st.text(f"📝 Draft: {state_counts['draft']}")
         st.text(f"✅ Published: {state_counts['published']}")
         st.text(f"🗄️ Archived: {state_counts['archived']}")
         
         # Resource type breakdown
         st.subheader("Resource Types")
-        type_counts = {}
-        for card in cards:
-            res_type = card['resource_type']
-            type_counts[res_type] = type_counts.get(res_type, 0) + 1
-        
         for res_type, count in sorted(type_counts.items()):
             st.text(f"⚡ {res_type}: {count}")
     else:
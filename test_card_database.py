@@ -0,0 +1,172 @@
+"""
+Query-count and query-plan regression tests for the card database layer
+Runs against a throwaway SQLite database
+"""
+
+import pytest
+import card_database
+from card_database import count_queries
+from resource_core_generator import generate_resource_core
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    """Point card_database at a fresh SQLite file and reset its per-process caches"""
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'cards.db'}")
+    monkeypatch.setattr(card_database, "_initialized", False)
+    card_database.get_db_engine.cache_clear()
+    card_database.get_sessionmaker.cache_clear()
+    card_database.init_database()
+    engine = card_database.get_db_engine()
+    yield engine
+    engine.dispose()
+    card_database.get_db_engine.cache_clear()
+    card_database.get_sessionmaker.cache_clear()
+
+
+@pytest.fixture
+def saved_cores(engine):
+    """A batch of draft Resource Cores already stored in the database"""
+    cores = [generate_resource_core("Energy") for _ in range(20)]
+    assert card_database.save_cards_bulk(cores)
+    return cores
+
+
+def test_load_recent_cards_is_one_query(engine, saved_cores):
+    with count_queries(engine) as statements:
+        cards = card_database.load_recent_cards(limit=100)
+        # Touch every displayed column; none of them may lazy-load
+        for card in cards:
+            (card.card_id, card.size, card.rarity, card.state, card.score)
+    assert len(cards) == len(saved_cores)
+    assert len(statements) <= 1
+
+
+def test_load_recent_cards_uses_type_created_index(engine, saved_cores):
+    stmt = card_database.recent_cards_statement(limit=100)
+    sql = stmt.compile(engine, compile_kwargs={"literal_binds": True})
+    with engine.connect() as conn:
+        plan = " ".join(row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}"))
+    assert "ix_cards_type_created" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_get_state_stats_is_one_query(engine, saved_cores):
+    with count_queries(engine) as statements:
+        stats = card_database.get_state_stats()
+    assert stats["total"] == stats["draft"] == len(saved_cores)
+    assert len(statements) <= 1
+
+
+def test_bulk_update_states_is_one_query(engine, saved_cores):
+    card_ids = [core.card_id for core in saved_cores]
+    with count_queries(engine) as statements:
+        assert card_database.bulk_update_states(card_ids, "published")
+    assert len(statements) <= 1
+    assert card_database.get_state_stats()["published"] == len(saved_cores)
+
+
+def test_load_filtered_cards_filters_in_one_query(engine, saved_cores):
+    assert card_database.update_card_state(saved_cores[0].card_id, "published")
+    small_cores = [core for core in saved_cores if core.size == "Small"]
+    with count_queries(engine) as statements:
+        published = card_database.load_filtered_cards(states=["published"])
+        small = card_database.load_filtered_cards(sizes=["Small"], resource_types=["Energy"])
+        none = card_database.load_filtered_cards(resource_types=["Omni"])
+    assert len(statements) == 3
+    assert [card.card_id for card in published] == [saved_cores[0].card_id]
+    assert {card.card_id for card in small} == {core.card_id for core in small_cores}
+    assert none == []
+
+
+def test_bulk_transition_where_is_one_query(engine, saved_cores):
+    assert card_database.save_card(generate_resource_core("Matter"), card_type="Commander")
+    with count_queries(engine) as statements:
+        assert card_database.bulk_transition_where("draft", "published", card_types=["Resource Core"])
+    assert len(statements) <= 1
+    stats = card_database.get_state_stats()
+    assert stats["published"] == len(saved_cores)
+    assert stats["draft"] == 1
+
+
+def test_get_filtered_cards_pages_in_sql(engine, saved_cores):
+    assert card_database.update_card_state(saved_cores[0].card_id, "published")
+    with count_queries(engine) as statements:
+        counts = card_database.get_filtered_state_counts(states=["draft", "published"])
+        first = card_database.get_filtered_cards(limit=8)
+        last = card_database.get_filtered_cards(limit=8, offset=16)
+    assert len(statements) == 3
+    assert counts == {"draft": len(saved_cores) - 1, "published": 1}
+    assert len(first) == 8
+    assert len(last) == len(saved_cores) - 16
+    assert not {card.card_id for card in first} & {card.card_id for card in last}
+
+
+# generated_cards as created before score became a generated column
+BASELINE_SCHEMA = """
+CREATE TABLE generated_cards (
+    card_id VARCHAR(12) PRIMARY KEY, card_type VARCHAR(50), size VARCHAR(20), resource_type VARCHAR(20),
+    tier INTEGER, quality INTEGER, rarity VARCHAR(20), cost INTEGER, rpt INTEGER, hp INTEGER, links INTEGER,
+    score FLOAT, state VARCHAR(20), notes VARCHAR(500), published_at DATETIME, archived_at DATETIME, created_at DATETIME
+)
+"""
+
+
+def test_baseline_schema_scores_are_backfilled_and_written(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'legacy.db'}")
+    monkeypatch.setattr(card_database, "_initialized", False)
+    card_database.get_db_engine.cache_clear()
+    card_database.get_sessionmaker.cache_clear()
+    engine = card_database.get_db_engine()
+    try:
+        with engine.begin() as conn:
+            conn.exec_driver_sql(BASELINE_SCHEMA)
+            # A row saved while the code assumed a generated column
+            conn.exec_driver_sql(
+                "INSERT INTO generated_cards (card_id, card_type, tier, quality, state, created_at) "
+                "VALUES ('legacy000001', 'Resource Core', 2, 50, 'draft', '2025-01-01 00:00:00')"
+            )
+        card_database.init_database()
+        core = generate_resource_core("Energy")
+        assert card_database.save_card(core)
+        assert card_database.save_cards_bulk([generate_resource_core("Matter") for _ in range(3)])
+        scores = {card.card_id: card.score for card in card_database.load_recent_cards(limit=10)}
+        assert len(scores) == 5
+        assert None not in scores.values()
+        assert scores["legacy000001"] == pytest.approx(50 * 0.7 + 2 * 3)
+        assert scores[core.card_id] == pytest.approx(core.score)
+    finally:
+        engine.dispose()
+        card_database.get_db_engine.cache_clear()
+        card_database.get_sessionmaker.cache_clear()
+
+
+def test_get_filtered_cards_pages_are_disjoint_with_tied_timestamps(engine, saved_cores):
+    # Every card shares one created_at, so only card_id can order the pages
+    with engine.begin() as conn:
+        conn.exec_driver_sql("UPDATE generated_cards SET created_at = '2025-01-01 00:00:00'")
+    pages = [card_database.get_filtered_cards(limit=6, offset=offset) for offset in range(0, 24, 6)]
+    paged_ids = [card.card_id for page in pages for card in page]
+    assert len(paged_ids) == len(set(paged_ids)) == len(saved_cores)
+    assert set(paged_ids) == {core.card_id for core in saved_cores}
+    assert paged_ids == sorted(paged_ids, reverse=True)
+
+    stmt = card_database.filtered_cards_statement(states=["draft"], limit=6, offset=6)
+    sql = stmt.compile(engine, compile_kwargs={"literal_binds": True})
+    with engine.connect() as conn:
+        plan = " ".join(row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}"))
+    assert "ix_cards_state_created_id" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_null_states_are_backfilled_so_counts_match_transitions(engine, saved_cores, monkeypatch):
+    with engine.begin() as conn:
+        conn.exec_driver_sql(f"UPDATE generated_cards SET state = NULL WHERE card_id = '{saved_cores[0].card_id}'")
+    monkeypatch.setattr(card_database, "_initialized", False)
+    card_database.init_database()
+    
+    counts = card_database.get_filtered_state_counts()
+    assert counts == {"draft": len(saved_cores)}
+    assert card_database.bulk_transition_where("draft", "published")
+    assert card_database.get_filtered_state_counts() == {"published": len(saved_cores)}
+    assert card_database.get_card(saved_cores[0].card_id).state == "published"
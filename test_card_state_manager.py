@@ -0,0 +1,44 @@
+"""
+Tests for the JSON-backed card state manager
+"""
+
+from card_state_manager import CardStateManager
+
+
+def test_get_card_states_returns_known_ids_only(tmp_path):
+    manager = CardStateManager(data_dir=str(tmp_path))
+    manager.create_cards_bulk([
+        ("test_abc123", "resource_core", ""),
+        ("test_def456", "commander", ""),
+    ])
+    manager.transition_state("test_def456", "published")
+    
+    looked_up = manager.get_card_states(["test_abc123", "test_def456", "missing_id"])
+    assert set(looked_up) == {"test_abc123", "test_def456"}
+    assert looked_up["test_abc123"].state == "draft"
+    assert looked_up["test_def456"].state == "published"
+    assert manager.get_card_states([]) == {}
+
+
+def test_get_cards_by_state_keeps_creation_order_across_reload(tmp_path):
+    manager = CardStateManager(data_dir=str(tmp_path))
+    manager.create_cards_bulk([(card_id, "resource_core", "") for card_id in ("a", "b", "c")])
+    manager.transition_state("c", "published")
+    manager.transition_state("a", "published")
+    
+    published = [card.card_id for card in manager.get_cards_by_state("published")]
+    assert published == ["a", "c"]
+    reopened = CardStateManager(data_dir=str(tmp_path))
+    assert [card.card_id for card in reopened.get_cards_by_state("published")] == published
+
+
+def test_bulk_transition_stats_persist_across_reload(tmp_path):
+    manager = CardStateManager(data_dir=str(tmp_path))
+    manager.create_cards_bulk([(f"card{i}", "resource_core", "") for i in range(6)] + [("cmd0", "commander", "")])
+    manager.bulk_transition(["card0", "card1", "cmd0"], "published")
+    manager.bulk_transition(["card1", "card2"], "archived")
+    
+    manager2 = CardStateManager(data_dir=str(tmp_path))
+    assert manager2.get_stats() == manager.get_stats()
+    assert manager.get_stats()["published"] == 2
+    assert manager.get_stats()["archived"] == 2
@@ -28,9 +28,11 @@ def test_publishing_system():
     # Test 2: Create draft cards
     print("\n✅ Test 2: Create Draft Cards")
     try:
-        card1 = manager.create_card_state("test_abc123", "resource_core", "Test energy core")
-        card2 = manager.create_card_state("test_def456", "commander", "Test commander")
-        card3 = manager.create_card_state("test_ghi789", "resource_core", "Test matter core")
+        card1, card2, card3 = manager.create_cards_bulk([
+            ("test_abc123", "resource_core", "Test energy core"),
+            ("test_def456", "commander", "Test commander"),
+            ("test_ghi789", "resource_core", "Test matter core")
+        ])
         print(f"   ✓ Created 3 cards in draft state")
         print(f"   ✓ Card 1: {card1.card_id} - {card1.state}")
         print(f"   ✓ Card 2: {card2.card_id} - {card2.state}")
@@ -89,6 +91,13 @@ def test_publishing_system():
         commanders = manager.get_cards_by_type("commander")
         print(f"   ✓ Commanders: {len(commanders)}")
         
+        looked_up = manager.get_card_states(["test_abc123", "test_def456", "missing_id"])
+        if set(looked_up) == {"test_abc123", "test_def456"}:
+            print(f"   ✓ Bulk lookup found {len(looked_up)} of 3 IDs")
+        else:
+            print(f"   ✗ Bulk lookup mismatch: {sorted(looked_up)}")
+            return False
+        
     except Exception as e:
         print(f"   ✗ Failed: {e}")
         return False
@@ -136,6 +145,13 @@ def test_publishing_system():
         else:
             print(f"   ✗ Mismatch: {loaded_count} vs {len(all_cards)}")
             return False
+        
+        # Bulk transitions are written once per batch; make sure they landed
+        if manager2.get_stats() == manager.get_stats():
+            print(f"   ✓ Card states persisted correctly")
+        else:
+            print(f"   ✗ State mismatch: {manager2.get_stats()} vs {manager.get_stats()}")
+            return False
             
     except Exception as e:
         print(f"   ✗ Failed: {e}")
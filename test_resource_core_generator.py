@@ -0,0 +1,75 @@
+"""
+Tests for Resource Core generation: size-conditioned rolls and the vectorized batch path
+"""
+
+import pytest
+from collections import Counter
+from resource_core_generator import (
+    CORE_RANGES, TIERS_BY_SIZE, determine_rarity, determine_size_from_tier,
+    generate_resource_core, generate_resource_core_batch, weighted_roll, _build_alias,
+    analyze_batch, cores_from_frame
+)
+
+
+@pytest.mark.parametrize("size", [None, "Small", "Massive"])
+def test_batch_rows_follow_generation_rules(size):
+    batch = generate_resource_core_batch(2000, "Signal", size=size)
+    assert len(batch) == 2000
+    assert batch["card_id"].is_unique
+    for core in batch.itertuples(index=False):
+        assert core.size == determine_size_from_tier(core.tier)
+        assert core.rarity == determine_rarity(core.tier, core.quality)
+        assert 1 <= core.quality <= 100
+        for stat, (min_val, max_val) in CORE_RANGES[core.size].items():
+            assert min_val <= getattr(core, stat) <= max_val
+    if size:
+        assert set(batch["tier"]) <= set(TIERS_BY_SIZE[size])
+
+
+def test_batch_tier_distribution_favours_low_tiers():
+    counts = generate_resource_core_batch(20000)["tier"].value_counts()
+    assert counts[1] > counts[5] > counts[10]
+
+
+@pytest.mark.parametrize("size", list(CORE_RANGES))
+def test_single_core_is_generated_at_requested_size(size):
+    # Size conditions the tier roll directly; no re-roll loop is involved
+    for _ in range(200):
+        assert generate_resource_core(size=size).size == size
+
+
+@pytest.mark.parametrize("weight", [0.0, 0.01, 0.5, 1.0])
+def test_weighted_roll_matches_linear_weights(weight):
+    # The closed-form draw must follow the 1 + i*weight*10 value weights
+    min_val, max_val, n = 5, 10, 60000
+    counts = Counter(weighted_roll(min_val, max_val, weight) for _ in range(n))
+    weights = [1 + i * weight * 10 for i in range(max_val - min_val + 1)]
+    assert set(counts) <= set(range(min_val, max_val + 1))
+    for value, w in zip(range(min_val, max_val + 1), weights):
+        assert counts[value] / n == pytest.approx(w / sum(weights), abs=0.01)
+
+
+@pytest.mark.parametrize("weights", [[11 - tier for tier in range(1, 11)], [101 - q for q in range(1, 101)], [4, 3], [1, 1, 1]])
+def test_alias_tables_reproduce_weights(weights):
+    prob, alias = _build_alias(weights)
+    n = len(weights)
+    # Slot i yields i with prob[i] and alias[i] otherwise; each slot is picked with 1/n
+    mass = [0.0] * n
+    for i in range(n):
+        mass[i] += prob[i] / n
+        mass[alias[i]] += (1 - prob[i]) / n
+    assert mass == pytest.approx([w / sum(weights) for w in weights])
+
+
+def test_analyze_batch_reads_frames_and_lists_alike(capsys):
+    batch = generate_resource_core_batch(500)
+    analyze_batch(batch)
+    from_frame = capsys.readouterr().out
+    analyze_batch(cores_from_frame(batch))
+    assert capsys.readouterr().out == from_frame
+
+
+@pytest.mark.parametrize("tier", [-1, 0, 11])
+def test_determine_size_from_tier_rejects_out_of_range_tiers(tier):
+    with pytest.raises(ValueError):
+        determine_size_from_tier(tier)
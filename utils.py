@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import io
 import streamlit as st
 import inspect
 import textwrap
@@ -23,4 +24,12 @@ def show_code(demo):
         # Showing the code of the demo.
         st.markdown("## Code")
         sourcelines, _ = inspect.getsourcelines(demo)
-        st.code(textwrap.dedent("".join(sourcelines[1:])))
\ No newline at end of file
+        st.code(textwrap.dedent("".join(sourcelines[1:])))
+
+# Serialized only when a table's contents change, not on every rerun
+@st.cache_data(max_entries=4, show_spinner=False)
+def csv_bytes(df):
+    """Encode a DataFrame as UTF-8 CSV bytes for st.download_button."""
+    buffer = io.BytesIO()
+    df.to_csv(buffer, index=False, encoding='utf-8')
+    return buffer.getvalue()